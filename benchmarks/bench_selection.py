@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""Benchmark and fairness simulation for choose_varied / calc_recent_max.
+
+Runs without Home Assistant or network: selection.py only needs hass.data
+and a Store-like object, so both are replaced by in-memory stand-ins.
+
+    python benchmarks/bench_selection.py
+    python benchmarks/bench_selection.py --sizes 1000 100000 --selections 2000000 --churn 0.01
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import math
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+import types
+from collections import deque
+
+PKG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "custom_components", "paperlesspaper_push")
+
+
+def _load_selection():
+    # Register the integration as a bare package so its __init__ (which needs
+    # Home Assistant) is not executed; only const.py and selection.py are loaded.
+    pkg = types.ModuleType("paperlesspaper_push")
+    pkg.__path__ = [os.path.normpath(PKG_DIR)]
+    sys.modules["paperlesspaper_push"] = pkg
+    const = importlib.import_module("paperlesspaper_push.const")
+    selection = importlib.import_module("paperlesspaper_push.selection")
+    return const, selection
+
+
+const, selection = _load_selection()
+
+
+class MemoryStore:
+    """In-memory stand-in for homeassistant.helpers.storage.Store.
+
+    Data goes through a JSON round-trip on save, like the real Store does
+    when writing to .storage.
+    """
+
+    def __init__(self):
+        self._data = None
+        self.saves = 0
+
+    async def async_load(self):
+        return self._data
+
+    async def async_save(self, data):
+        self._data = json.loads(json.dumps(data))
+        self.saves += 1
+
+
+class FakeHass:
+    def __init__(self):
+        self.data = {const.DOMAIN: {"store_recent": MemoryStore()}}
+
+
+def _file_names(start: int, count: int) -> list[str]:
+    return [f"img_{i:07d}.png" for i in range(start, start + count)]
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    k = (len(values) - 1) * pct / 100
+    lo, hi = math.floor(k), math.ceil(k)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+async def bench_latency(n_files: int, calls: int, alloc_calls: int) -> dict:
+    """Per-call latency and allocation peak of choose_varied at a fixed pool size."""
+    hass = FakeHass()
+    files = _file_names(0, n_files)
+
+    # Warm up the recent window so every call sees a full window
+    for _ in range(selection.calc_recent_max(n_files)):
+        await selection.choose_varied(hass, files)
+
+    timings = []
+    for _ in range(calls):
+        t0 = time.perf_counter()
+        await selection.choose_varied(hass, files)
+        timings.append(time.perf_counter() - t0)
+
+    # tracemalloc slows everything down, so measure allocations separately
+    peaks = []
+    tracemalloc.start()
+    for _ in range(alloc_calls):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        await selection.choose_varied(hass, files)
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+
+    return {
+        "files": n_files,
+        "recent_max": selection.calc_recent_max(n_files),
+        "calls": calls,
+        "mean_us": statistics.fmean(timings) * 1e6,
+        "p50_us": _percentile(timings, 50) * 1e6,
+        "p99_us": _percentile(timings, 99) * 1e6,
+        "max_us": max(timings) * 1e6,
+        "peak_alloc_kib": max(peaks) / 1024 if peaks else float("nan"),
+    }
+
+
+async def simulate_fairness(n_files: int, selections: int, churn: float, seed: int) -> dict:
+    """Run many selections on a changing pool and measure how evenly files are shown.
+
+    churn is the probability per selection that one file is removed and a new
+    one is added (pool size stays constant).
+    """
+    random.seed(seed)
+    rng = random.Random(seed + 1)
+    hass = FakeHass()
+
+    files = _file_names(0, n_files)
+    next_id = n_files
+    present = set(files)
+    index = {f: i for i, f in enumerate(files)}
+
+    added_at: dict[str, int] = {f: 0 for f in files}
+    last_shown: dict[str, int] = {}
+    intervals: list[int] = []
+    coverage_times: list[int] = []  # selections from a file being added until first shown
+    recent_window = deque(maxlen=selection.calc_recent_max(n_files))
+    window_repeats = 0
+    initial_unseen = set(files)
+    full_coverage_at = None
+
+    t0 = time.perf_counter()
+    for step in range(1, selections + 1):
+        if churn and rng.random() < churn:
+            # Swap-remove keeps files a list without O(n) deletes
+            victim = files[rng.randrange(len(files))]
+            i = index.pop(victim)
+            last = files.pop()
+            if last is not victim:
+                files[i] = last
+                index[last] = i
+            present.discard(victim)
+            initial_unseen.discard(victim)
+            added_at.pop(victim, None)
+            last_shown.pop(victim, None)
+
+            new = f"img_{next_id:07d}.png"
+            next_id += 1
+            index[new] = len(files)
+            files.append(new)
+            present.add(new)
+            added_at[new] = step
+
+        chosen = await selection.choose_varied(hass, files)
+
+        if chosen in recent_window:
+            window_repeats += 1
+        recent_window.append(chosen)
+
+        prev = last_shown.get(chosen)
+        if prev is None:
+            coverage_times.append(step - added_at[chosen])
+        else:
+            intervals.append(step - prev)
+        last_shown[chosen] = step
+
+        if initial_unseen:
+            initial_unseen.discard(chosen)
+            if not initial_unseen and full_coverage_at is None:
+                full_coverage_at = step
+
+    elapsed = time.perf_counter() - t0
+    harmonic = sum(1 / k for k in range(1, n_files + 1))
+    never_shown = sum(1 for f in present if f not in last_shown)
+
+    return {
+        "files": n_files,
+        "selections": selections,
+        "churn": churn,
+        "elapsed_s": elapsed,
+        "us_per_selection": elapsed / selections * 1e6,
+        "full_coverage_at": full_coverage_at,
+        # Pure random needs about n * H(n) draws to show every file once
+        "coupon_collector": round(n_files * harmonic),
+        "first_show_p50": _percentile(coverage_times, 50),
+        "first_show_p99": _percentile(coverage_times, 99),
+        "repeat_interval_min": min(intervals) if intervals else None,
+        "repeat_interval_p5": _percentile(intervals, 5),
+        "repeat_interval_p50": _percentile(intervals, 50),
+        "repeat_interval_p95": _percentile(intervals, 95),
+        "window_repeats": window_repeats,
+        "never_shown": never_shown,
+    }
+
+
+def _print_table(title: str, rows: list[dict]) -> None:
+    print(f"\n{title}")
+    if not rows:
+        return
+    keys = list(rows[0])
+    cells = [[_fmt(r[k]) for k in keys] for r in rows]
+    widths = [max(len(k), *(len(c[i]) for c in cells)) for i, k in enumerate(keys)]
+    print("  ".join(k.rjust(w) for k, w in zip(keys, widths)))
+    for c in cells:
+        print("  ".join(v.rjust(w) for v, w in zip(c, widths)))
+
+
+def _fmt(v) -> str:
+    if isinstance(v, float):
+        if math.isnan(v):
+            return "nan"
+        return f"{v:.3g}" if abs(v) < 1 else f"{v:.1f}"
+    return "-" if v is None else str(v)
+
+
+async def _main(args) -> dict:
+    latency = []
+    for n in args.sizes:
+        # Keep total work roughly constant across pool sizes
+        calls = max(50, min(args.calls, args.calls * 1000 // n))
+        latency.append(await bench_latency(n, calls, args.alloc_calls))
+
+    fairness = []
+    for n in args.sim_sizes:
+        for churn in args.churn:
+            fairness.append(await simulate_fairness(n, args.selections, churn, args.seed))
+
+    return {"latency": latency, "fairness": fairness}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1_000, 10_000, 100_000],
+                        help="pool sizes for the latency benchmark")
+    parser.add_argument("--calls", type=int, default=2_000, help="timed calls per pool size (scaled down for large pools)")
+    parser.add_argument("--alloc-calls", type=int, default=20, help="calls measured with tracemalloc per pool size")
+    parser.add_argument("--sim-sizes", type=int, nargs="+", default=[10, 60, 200, 1_000],
+                        help="pool sizes for the fairness simulation")
+    parser.add_argument("--selections", type=int, default=200_000, help="selections per fairness simulation")
+    parser.add_argument("--churn", type=float, nargs="+", default=[0.0, 0.01],
+                        help="probability per selection that one file is replaced")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="print raw results as JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(_main(args))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    _print_table("choose_varied latency (us) and peak allocation per call", results["latency"])
+    _print_table("fairness simulation (intervals and first-show times in selections)", results["fairness"])
+
+
+if __name__ == "__main__":
+    main()
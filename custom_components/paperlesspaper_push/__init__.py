@@ -1,7 +1,9 @@
 import logging
+import os
 from datetime import datetime, timezone
 
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.storage import Store
 from homeassistant.helpers.typing import ConfigType
 
@@ -19,6 +21,19 @@ from .const import (
     CONF_PUBLISH,
     CONF_DEVICE_ID, 
     CONF_SCAN_INTERVAL, 
+    CONF_PREFLIGHT,
+    CONF_FRAME_WIDTH,
+    CONF_FRAME_HEIGHT,
+    CONF_WATCH,
+    CONF_WATCH_POLLING,
+    CONF_WATCH_DEBOUNCE,
+    CONF_WATCH_POLL_INTERVAL,
+    CONF_THUMBNAIL,
+    CONF_THUMBNAIL_ONLY,
+    CONF_THUMBNAIL_SIZE,
+    CONF_THUMBNAIL_QUALITY,
+    CONF_THUMBNAIL_FORMAT,
+    CONF_OPTIMIZE_UPLOAD,
     DEFAULT_SCAN_INTERVAL,
     DEFAULT_BASE_URL,
     DEFAULT_INPUT_DIR,
@@ -26,9 +41,23 @@ from .const import (
     DEFAULT_TIMEOUT,
     DEFAULT_MAX_ATTEMPTS,
     DEFAULT_PUBLISH,
+    DEFAULT_FRAME_WIDTH,
+    DEFAULT_FRAME_HEIGHT,
+    DEFAULT_WATCH,
+    DEFAULT_WATCH_POLLING,
+    DEFAULT_WATCH_DEBOUNCE,
+    DEFAULT_WATCH_POLL_INTERVAL,
+    DEFAULT_THUMBNAIL,
+    DEFAULT_THUMBNAIL_ONLY,
+    DEFAULT_THUMBNAIL_SIZE,
+    DEFAULT_THUMBNAIL_QUALITY,
+    DEFAULT_THUMBNAIL_FORMAT,
+    DEFAULT_OPTIMIZE_UPLOAD,
     STORE_VERSION,
     STORE_KEY_STATE,
     STORE_KEY_RECENT,
+    STORE_KEY_ARRIVALS,
+    CACHE_DIR,
     SERVICE_UPLOAD_RANDOM,
     SERVICE_RESET_RECENT,
     SERVICE_FIELD_FORCE_FILE,
@@ -39,20 +68,33 @@ from .const import (
     ATTR_LAST_RESULT,
     ATTR_LAST_HTTP_STATUS,
     ATTR_LAST_ERROR,
+    ATTR_INVALID_FILES,
+    ATTR_THUMBNAIL_NAME,
+    ATTR_UPLOAD_BYTES,
+    ATTR_BYTES_SAVED,
     STATE_SUCCESS,
     STATE_FAILED,
+    HTTP_NON_RETRYABLE,
 )
 
 from .helper import (
     async_list_images,
-    choose_varied,
     async_publish_copy,
     upload_with_retries,
     guess_mime_type,
     async_clear_publish_dir,
 )
 
+from .imaging import (
+    THUMBNAIL_FORMATS,
+    async_encode_for_upload,
+    async_publish_thumbnail,
+    async_shutdown_pool,
+)
+from .preflight import async_preflight_images
+from .selection import choose_varied, remember_recent
 from .sensor import async_setup_sensors
+from .watcher import ArrivalsQueue, InputDirWatcher
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -79,8 +121,35 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
         CONF_TIMEOUT: int(cfg.get(CONF_TIMEOUT, DEFAULT_TIMEOUT)),
         CONF_MAX_ATTEMPTS: int(cfg.get(CONF_MAX_ATTEMPTS, DEFAULT_MAX_ATTEMPTS)),
         CONF_PUBLISH: bool(cfg.get(CONF_PUBLISH, DEFAULT_PUBLISH)),
+        # Only on by default when the frame size is configured explicitly,
+        # otherwise every image of a non-7" frame would be rejected
+        CONF_PREFLIGHT: bool(cfg.get(CONF_PREFLIGHT, CONF_FRAME_WIDTH in cfg and CONF_FRAME_HEIGHT in cfg)),
+        CONF_FRAME_WIDTH: int(cfg.get(CONF_FRAME_WIDTH, DEFAULT_FRAME_WIDTH)),
+        CONF_FRAME_HEIGHT: int(cfg.get(CONF_FRAME_HEIGHT, DEFAULT_FRAME_HEIGHT)),
+        CONF_WATCH: bool(cfg.get(CONF_WATCH, DEFAULT_WATCH)),
+        CONF_WATCH_POLLING: bool(cfg.get(CONF_WATCH_POLLING, DEFAULT_WATCH_POLLING)),
+        CONF_WATCH_DEBOUNCE: int(cfg.get(CONF_WATCH_DEBOUNCE, DEFAULT_WATCH_DEBOUNCE)),
+        CONF_WATCH_POLL_INTERVAL: int(cfg.get(CONF_WATCH_POLL_INTERVAL, DEFAULT_WATCH_POLL_INTERVAL)),
+        CONF_THUMBNAIL: bool(cfg.get(CONF_THUMBNAIL, DEFAULT_THUMBNAIL)),
+        CONF_THUMBNAIL_ONLY: bool(cfg.get(CONF_THUMBNAIL_ONLY, DEFAULT_THUMBNAIL_ONLY)),
+        CONF_THUMBNAIL_SIZE: int(cfg.get(CONF_THUMBNAIL_SIZE, DEFAULT_THUMBNAIL_SIZE)),
+        CONF_THUMBNAIL_QUALITY: int(cfg.get(CONF_THUMBNAIL_QUALITY, DEFAULT_THUMBNAIL_QUALITY)),
+        CONF_THUMBNAIL_FORMAT: str(cfg.get(CONF_THUMBNAIL_FORMAT, DEFAULT_THUMBNAIL_FORMAT)).lower(),
+        CONF_OPTIMIZE_UPLOAD: bool(cfg.get(CONF_OPTIMIZE_UPLOAD, DEFAULT_OPTIMIZE_UPLOAD)),
     }
 
+    if hass.data[DOMAIN]["config"][CONF_THUMBNAIL_FORMAT] not in THUMBNAIL_FORMATS:
+        _LOGGER.error(
+            "Invalid '%s' (use one of: %s)", CONF_THUMBNAIL_FORMAT, ", ".join(THUMBNAIL_FORMATS)
+        )
+        return False
+    if hass.data[DOMAIN]["config"][CONF_THUMBNAIL_SIZE] < 1:
+        _LOGGER.error("Invalid '%s' (must be at least 1)", CONF_THUMBNAIL_SIZE)
+        return False
+    if not 1 <= hass.data[DOMAIN]["config"][CONF_THUMBNAIL_QUALITY] <= 100:
+        _LOGGER.error("Invalid '%s' (must be between 1 and 100)", CONF_THUMBNAIL_QUALITY)
+        return False
+
     device_id = cfg.get(CONF_DEVICE_ID)
     scan_interval = int(cfg.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL))
 
@@ -105,6 +174,44 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     # Load persisted state (for sensor restore)
     state_data = await hass.data[DOMAIN]["store_state"].async_load() or {}
     hass.data[DOMAIN]["state"] = state_data
+    hass.data[DOMAIN][ATTR_INVALID_FILES] = []
+    hass.data[DOMAIN]["cache_dir"] = hass.config.path(".cache", CACHE_DIR)
+
+    @callback
+    def _shutdown_pool(event):
+        async_shutdown_pool()
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _shutdown_pool)
+
+    # New arrivals in input_dir are shown before the varied-random pool
+    if hass.data[DOMAIN]["config"][CONF_WATCH]:
+        @callback
+        def _arrivals_changed():
+            # Keep the queued_arrivals attribute current between uploads
+            dispatcher = hass.data[DOMAIN].get("dispatcher_update")
+            if dispatcher:
+                dispatcher()
+
+        arrivals = ArrivalsQueue(Store(hass, STORE_VERSION, STORE_KEY_ARRIVALS), on_change=_arrivals_changed)
+        await arrivals.async_load()
+        hass.data[DOMAIN]["arrivals"] = arrivals
+
+        watcher = InputDirWatcher(
+            hass,
+            input_dir=hass.data[DOMAIN]["config"][CONF_INPUT_DIR],
+            queue=arrivals,
+            debounce_s=hass.data[DOMAIN]["config"][CONF_WATCH_DEBOUNCE],
+            poll_interval_s=hass.data[DOMAIN]["config"][CONF_WATCH_POLL_INTERVAL],
+            force_polling=hass.data[DOMAIN]["config"][CONF_WATCH_POLLING],
+        )
+        await watcher.async_start()
+        hass.data[DOMAIN]["watcher"] = watcher
+
+        @callback
+        def _stop_watcher(event):
+            watcher.async_stop()
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _stop_watcher)
 
     # Setup sensor platform
     await async_setup_sensors(hass)
@@ -131,43 +238,89 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
         force_file = call.data.get(SERVICE_FIELD_FORCE_FILE)
 
         files = await async_list_images(hass, input_dir)
+
+        # Header-only preflight: keep wrong-sized/corrupt files out of selection
+        if cfg2[CONF_PREFLIGHT]:
+            files, invalid = await async_preflight_images(
+                hass, input_dir, files, cfg2[CONF_FRAME_WIDTH], cfg2[CONF_FRAME_HEIGHT]
+            )
+            if invalid and invalid != hass.data[DOMAIN][ATTR_INVALID_FILES]:
+                _LOGGER.warning(
+                    "Skipping %s invalid image(s) in %s (see sensor attribute '%s')",
+                    len(invalid), input_dir, ATTR_INVALID_FILES,
+                )
+            hass.data[DOMAIN][ATTR_INVALID_FILES] = invalid
+
         if not files:
-            _LOGGER.warning("No images found in %s", input_dir)
+            _LOGGER.warning("No valid images found in %s", input_dir)
             await _save_state_and_update_sensor({
                 "last_upload": hass.data[DOMAIN]["state"].get("last_upload"),
                 ATTR_CURRENT_FILENAME: None,
                 ATTR_LAST_RESULT: STATE_FAILED,
                 ATTR_LAST_HTTP_STATUS: None,
-                ATTR_LAST_ERROR: f"No images in {input_dir}",
+                ATTR_LAST_ERROR: f"No valid images in {input_dir}",
             })
             return
 
         if force_file:
             if force_file not in files:
-                _LOGGER.error("force_file '%s' not found in %s", force_file, input_dir)
+                rejected = next((i for i in hass.data[DOMAIN][ATTR_INVALID_FILES] if i["file"] == force_file), None)
+                if rejected:
+                    _LOGGER.error("force_file '%s' failed preflight: %s", force_file, rejected["reason"])
+                    error = f"force_file invalid: {force_file} ({rejected['reason']})"
+                else:
+                    _LOGGER.error("force_file '%s' not found in %s", force_file, input_dir)
+                    error = f"force_file not found: {force_file}"
                 await _save_state_and_update_sensor({
                     "last_upload": hass.data[DOMAIN]["state"].get("last_upload"),
                     ATTR_CURRENT_FILENAME: None,
                     ATTR_LAST_RESULT: STATE_FAILED,
                     ATTR_LAST_HTTP_STATUS: None,
-                    ATTR_LAST_ERROR: f"force_file not found: {force_file}",
+                    ATTR_LAST_ERROR: error,
                 })
                 return
             chosen = force_file
         else:
-            chosen = await choose_varied(hass, files)
+            chosen = None
+            # Peek only: the arrival leaves the queue after a successful upload
+            arrivals = hass.data[DOMAIN].get("arrivals")
+            if arrivals:
+                chosen = arrivals.async_peek(files)
+            if chosen:
+                _LOGGER.debug("Chose new arrival %s", chosen)
+                await remember_recent(hass, files, chosen)
+            else:
+                chosen = await choose_varied(hass, files)
 
         src_path = f"{input_dir.rstrip('/')}/{chosen}"
 
         published_name = None
+        thumbnail_name = None
         if publish:
             try:
                 await async_clear_publish_dir(hass, publish_dir)
-                published_name = await async_publish_copy(hass, src_path, publish_dir)
+                if not (cfg2[CONF_THUMBNAIL] and cfg2[CONF_THUMBNAIL_ONLY]):
+                    published_name = await async_publish_copy(hass, src_path, publish_dir)
             except Exception as e:
                 _LOGGER.exception("Publish copy failed: %s", e)
                 # Continue anyway: publish is helpful, not required.
 
+            if cfg2[CONF_THUMBNAIL]:
+                try:
+                    thumbnail_name = await async_publish_thumbnail(
+                        hass,
+                        src_path,
+                        publish_dir,
+                        hass.data[DOMAIN]["cache_dir"],
+                        cfg2[CONF_THUMBNAIL_SIZE],
+                        cfg2[CONF_THUMBNAIL_QUALITY],
+                        cfg2[CONF_THUMBNAIL_FORMAT],
+                    )
+                except ImportError:
+                    _LOGGER.warning("Thumbnail skipped: Pillow is not installed")
+                except Exception as e:
+                    _LOGGER.exception("Thumbnail failed: %s", e)
+
         if dry_run:
             _LOGGER.info("Dry-run: chosen=%s publish=%s published_name=%s", chosen, publish, published_name)
             await _save_state_and_update_sensor({
@@ -177,24 +330,65 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
                 ATTR_LAST_HTTP_STATUS: None,
                 ATTR_LAST_ERROR: None,
                 "published_name": published_name,
+                ATTR_THUMBNAIL_NAME: thumbnail_name,
             })
             return
 
         url = f"{base_url}/papers/uploadSingleImage/{paper_id}"
 
-        mime = guess_mime_type(src_path)
+        upload_path = src_path
+        upload_name = chosen
+        bytes_saved = 0
+        if cfg2[CONF_OPTIMIZE_UPLOAD]:
+            try:
+                upload_path, bytes_saved = await async_encode_for_upload(
+                    hass, src_path, hass.data[DOMAIN]["cache_dir"]
+                )
+            except ImportError:
+                _LOGGER.warning("Upload optimization skipped: Pillow is not installed")
+            except Exception as e:
+                _LOGGER.exception("Upload optimization failed, uploading original: %s", e)
+                upload_path, bytes_saved = src_path, 0
+            if upload_path != src_path:
+                upload_name = f"{os.path.splitext(chosen)[0]}.png"
+                _LOGGER.debug("Re-encoded %s as palette PNG, %s bytes saved", chosen, bytes_saved)
+
+        try:
+            upload_bytes = await hass.async_add_executor_job(os.path.getsize, upload_path)
+        except OSError as e:
+            # e.g. removed from input_dir between selection and upload
+            _LOGGER.error("Upload failed: %s not readable: %s", chosen, e)
+            await _save_state_and_update_sensor({
+                "last_upload": hass.data[DOMAIN]["state"].get("last_upload"),
+                ATTR_CURRENT_FILENAME: chosen,
+                ATTR_LAST_RESULT: STATE_FAILED,
+                ATTR_LAST_HTTP_STATUS: None,
+                ATTR_LAST_ERROR: f"File not readable: {chosen} ({e.strerror})",
+                "published_name": published_name,
+                ATTR_THUMBNAIL_NAME: thumbnail_name,
+            })
+            return
+
+        mime = guess_mime_type(upload_path)
         result = await upload_with_retries(
             hass=hass,
             url=url,
             api_key=api_key,
-            file_path=src_path,
+            file_path=upload_path,
             content_type=mime,
             timeout_s=timeout_s,
             max_attempts=max_attempts,
+            filename=upload_name,
         )
 
         if result.get("ok"):
-            _LOGGER.info("Upload succeeded: %s (%s)", chosen, result.get("status"))
+            arrivals = hass.data[DOMAIN].get("arrivals")
+            if arrivals:
+                arrivals.discard(chosen)
+            _LOGGER.info(
+                "Upload succeeded: %s (%s), %s bytes, %s bytes saved",
+                chosen, result.get("status"), upload_bytes, bytes_saved,
+            )
             await _save_state_and_update_sensor({
                 "last_upload": datetime.now(timezone.utc),
                 ATTR_CURRENT_FILENAME: chosen,
@@ -202,9 +396,17 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
                 ATTR_LAST_HTTP_STATUS: result.get("status"),
                 ATTR_LAST_ERROR: None,
                 "published_name": published_name,
+                ATTR_THUMBNAIL_NAME: thumbnail_name,
+                ATTR_UPLOAD_BYTES: upload_bytes,
+                ATTR_BYTES_SAVED: bytes_saved,
             })
         else:
             _LOGGER.error("Upload failed: %s (%s) %s", chosen, result.get("status"), result.get("error") or "")
+            # A rejected file would otherwise block the rotation forever; timeouts,
+            # 429 and 5xx keep it queued for the next run
+            arrivals = hass.data[DOMAIN].get("arrivals")
+            if arrivals and result.get("status") in HTTP_NON_RETRYABLE:
+                arrivals.discard(chosen)
             await _save_state_and_update_sensor({
                 "last_upload": hass.data[DOMAIN]["state"].get("last_upload"),
                 ATTR_CURRENT_FILENAME: chosen,
@@ -212,6 +414,9 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
                 ATTR_LAST_HTTP_STATUS: result.get("status"),
                 ATTR_LAST_ERROR: result.get("error") or result.get("body"),
                 "published_name": published_name,
+                ATTR_THUMBNAIL_NAME: thumbnail_name,
+                ATTR_UPLOAD_BYTES: upload_bytes,
+                ATTR_BYTES_SAVED: bytes_saved,
             })
 
     async def handle_reset_recent(call):
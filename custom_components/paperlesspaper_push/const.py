@@ -10,6 +10,19 @@ CONF_MAX_ATTEMPTS = "max_attempts"
 CONF_PUBLISH = "publish"
 CONF_DEVICE_ID = "device_id"         
 CONF_SCAN_INTERVAL = "scan_interval"
+CONF_PREFLIGHT = "preflight"
+CONF_FRAME_WIDTH = "frame_width"
+CONF_FRAME_HEIGHT = "frame_height"
+CONF_WATCH = "watch_input_dir"
+CONF_WATCH_POLLING = "watch_polling"
+CONF_WATCH_DEBOUNCE = "watch_debounce"
+CONF_WATCH_POLL_INTERVAL = "watch_poll_interval"
+CONF_THUMBNAIL = "thumbnail"
+CONF_THUMBNAIL_ONLY = "thumbnail_only"
+CONF_THUMBNAIL_SIZE = "thumbnail_size"
+CONF_THUMBNAIL_QUALITY = "thumbnail_quality"
+CONF_THUMBNAIL_FORMAT = "thumbnail_format"
+CONF_OPTIMIZE_UPLOAD = "optimize_upload"
 
 DEFAULT_BASE_URL = "https://api.memo.wirewire.de/v1"
 DEFAULT_INPUT_DIR = "/media/picture-frames/paperlesspaper"
@@ -18,15 +31,43 @@ DEFAULT_TIMEOUT = 30
 DEFAULT_MAX_ATTEMPTS = 4
 DEFAULT_PUBLISH = True
 DEFAULT_SCAN_INTERVAL = 900  # 15 min
+DEFAULT_FRAME_WIDTH = 800  # 7" frame
+DEFAULT_FRAME_HEIGHT = 480
+DEFAULT_WATCH = False
+DEFAULT_WATCH_POLLING = False  # force polling, e.g. for network shares without inotify
+DEFAULT_WATCH_DEBOUNCE = 5
+DEFAULT_WATCH_POLL_INTERVAL = 60
+DEFAULT_THUMBNAIL = False
+DEFAULT_THUMBNAIL_ONLY = False  # skip the full-resolution copy
+DEFAULT_THUMBNAIL_SIZE = 320  # longest edge in px
+DEFAULT_THUMBNAIL_QUALITY = 75
+DEFAULT_THUMBNAIL_FORMAT = "webp"
+DEFAULT_OPTIMIZE_UPLOAD = False
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp"}
+
+# Upload responses that are not retried (and drop the file from the arrivals queue)
+HTTP_NON_RETRYABLE = (400, 401, 403, 404)
 
 STORE_VERSION = 1
 STORE_KEY_STATE = f"{DOMAIN}_state"
 STORE_KEY_RECENT = f"{DOMAIN}_recent"
+STORE_KEY_ARRIVALS = f"{DOMAIN}_arrivals"
+
+# Below /config/.cache, for derived files (thumbnails, re-encoded uploads);
+# kept out of .storage so they do not end up in backups
+CACHE_DIR = DOMAIN
 
 ATTR_CURRENT_FILENAME = "current_filename"
 ATTR_LAST_RESULT = "last_result"
 ATTR_LAST_HTTP_STATUS = "last_http_status"
 ATTR_LAST_ERROR = "last_error"
+ATTR_INVALID_FILES = "invalid_files"
+ATTR_INVALID_COUNT = "invalid_count"
+INVALID_FILES_MAX = 20  # keep the state attribute well below the recorder's 16 KiB limit
+ATTR_THUMBNAIL_NAME = "thumbnail_name"
+ATTR_UPLOAD_BYTES = "upload_bytes"
+ATTR_BYTES_SAVED = "bytes_saved"
 
 STATE_SUCCESS = "success"
 STATE_FAILED = "failed"
@@ -3,23 +3,17 @@ import logging
 import os
 import random
 import shutil
-from collections import deque
 from datetime import datetime
 
 import aiohttp
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .const import DOMAIN
+from .const import HTTP_NON_RETRYABLE, IMAGE_EXTENSIONS
 
 _LOGGER = logging.getLogger(__name__)
 
 
-def calc_recent_max(n_files: int) -> int:
-    # 50% of files, minimum 5, maximum 50
-    return max(5, min(50, int(round(n_files * 0.5))))
-
-
 def guess_mime_type(path: str) -> str:
     ext = os.path.splitext(path)[1].lower()
     if ext == ".png":
@@ -36,7 +30,7 @@ async def async_list_images(hass: HomeAssistant, input_dir: str) -> list[str]:
 
 
 def _list_images_sync(input_dir: str) -> list[str]:
-    exts = {".png", ".jpg", ".jpeg", ".webp"}
+    exts = IMAGE_EXTENSIONS
     try:
         entries = os.listdir(input_dir)
     except FileNotFoundError:
@@ -49,27 +43,6 @@ def _list_images_sync(input_dir: str) -> list[str]:
     files.sort()
     return files
 
-async def choose_varied(hass: HomeAssistant, files: list[str], store_key: str = "recent") -> str:
-    """Choose a file with a moving 'recent' window persisted in Store."""
-    recent_max = calc_recent_max(len(files))
-
-    store = hass.data[DOMAIN]["store_recent"]
-    data = await store.async_load() or {}
-    recent = deque(data.get(store_key, data.get("recent", [])), maxlen=recent_max)
-
-    files_set = set(files)
-    recent = deque([f for f in recent if f in files_set], maxlen=recent_max)
-
-    recent_set = set(recent)
-    candidates = [f for f in files if f not in recent_set]
-    chosen = random.choice(candidates or files)
-
-    recent.append(chosen)
-    await store.async_save({"recent": list(recent)})
-
-    return chosen
-
-
 async def async_publish_copy(hass: HomeAssistant, src_path: str, publish_dir: str) -> str:
     """Copy chosen image to /config/www/... without blocking the event loop."""
     return await hass.async_add_executor_job(_publish_copy_sync, src_path, publish_dir)
@@ -109,6 +82,7 @@ async def upload_with_retries(
     content_type: str,
     timeout_s: int = 30,
     max_attempts: int = 4,
+    filename: str | None = None,
 ) -> dict:
     """Upload file as multipart/form-data (field 'picture') with retries/backoff."""
     session = async_get_clientsession(hass)
@@ -125,7 +99,7 @@ async def upload_with_retries(
             form.add_field(
                 "picture",
                 file_bytes,
-                filename=os.path.basename(file_path),
+                filename=filename or os.path.basename(file_path),
                 content_type=content_type,
             )
 
@@ -139,7 +113,7 @@ async def upload_with_retries(
                     return {"ok": True, "status": resp.status, "body": body}
 
                 # Hard fail: do not retry
-                if resp.status in (400, 401, 403, 404):
+                if resp.status in HTTP_NON_RETRYABLE:
                     return {
                         "ok": False,
                         "status": resp.status,
@@ -0,0 +1,209 @@
+import hashlib
+import importlib.util
+import logging
+import multiprocessing
+import os
+import shutil
+import site
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from types import ModuleType
+from typing import Callable, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+_LOGGER = logging.getLogger(__name__)
+
+# Keep the newest N files per cache subdirectory
+CACHE_KEEP = 200
+
+# Shut the worker process down after this many idle seconds (uploads are rare)
+POOL_IDLE_TIMEOUT = 60
+
+_WORKER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "worker")
+_WORKER_MODULE = "paperlesspaper_push_imaging"
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_jobs = 0
+_pool_idle_unsub: Optional[Callable[[], None]] = None
+
+
+def _load_worker() -> ModuleType:
+    """Load the worker module as a top-level module, like the pool process does.
+
+    Functions must be pickled by the same module name the worker process can
+    import; the worker only gets _WORKER_DIR on sys.path, so it never imports
+    this package (and with it Home Assistant).
+    """
+    module = sys.modules.get(_WORKER_MODULE)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(
+            _WORKER_MODULE, os.path.join(_WORKER_DIR, f"{_WORKER_MODULE}.py")
+        )
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[_WORKER_MODULE] = module
+        spec.loader.exec_module(module)
+    return module
+
+
+worker = _load_worker()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: forking the threaded Home Assistant process is not safe
+        _pool = ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=site.addsitedir,
+            initargs=(_WORKER_DIR,),
+        )
+    return _pool
+
+
+@callback
+def async_shutdown_pool(_now=None) -> None:
+    global _pool, _pool_idle_unsub
+    if _pool_idle_unsub is not None:
+        _pool_idle_unsub()
+        _pool_idle_unsub = None
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def async_run_in_pool(hass: HomeAssistant, func: Callable, *args):
+    """Run CPU-heavy image work in a process pool, falling back to the executor.
+
+    The worker process is started on demand and stopped again after
+    POOL_IDLE_TIMEOUT seconds without work.
+    """
+    global _pool_jobs, _pool_idle_unsub
+    if _pool_idle_unsub is not None:
+        _pool_idle_unsub()
+        _pool_idle_unsub = None
+
+    _pool_jobs += 1
+    try:
+        return await hass.loop.run_in_executor(_get_pool(), func, *args)
+    except (BrokenProcessPool, NotImplementedError, PermissionError) as e:
+        _LOGGER.warning("Process pool unavailable (%s), using executor instead", e)
+        async_shutdown_pool()
+        return await hass.async_add_executor_job(func, *args)
+    finally:
+        _pool_jobs -= 1
+        if _pool_jobs == 0 and _pool is not None and _pool_idle_unsub is None:
+            _pool_idle_unsub = async_call_later(hass, POOL_IDLE_TIMEOUT, async_shutdown_pool)
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _cache_lookup_sync(cache_dir: str, src_path: str, *suffixes: str) -> tuple[str, Optional[str]]:
+    """Return (cache path for src_path without suffix, first suffix found or None).
+
+    Refreshes the mtime of a hit so pruning keeps recently used entries.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    base = os.path.join(cache_dir, file_sha256(src_path))
+    for suffix in suffixes:
+        path = f"{base}{suffix}"
+        if os.path.isfile(path):
+            os.utime(path)
+            return base, suffix
+    return base, None
+
+
+def _prune_cache_sync(cache_dir: str, keep: int = CACHE_KEEP) -> None:
+    try:
+        entries = [e for e in os.scandir(cache_dir) if e.is_file()]
+    except FileNotFoundError:
+        return
+    if len(entries) <= keep:
+        return
+    entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+    for e in entries[keep:]:
+        try:
+            os.remove(e.path)
+        except OSError:
+            pass
+
+
+# Thumbnails
+
+THUMBNAIL_FORMATS = {"webp": ".webp", "jpeg": ".jpg"}
+
+
+def _copy_thumbnail_sync(cached_path: str, src_path: str, publish_dir: str, ext: str) -> str:
+    os.makedirs(publish_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(src_path))[0]
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    dst_name = f"thumb_{ts}_{stem}{ext}"
+    shutil.copyfile(cached_path, os.path.join(publish_dir, dst_name))
+    return dst_name
+
+
+async def async_publish_thumbnail(
+    hass: HomeAssistant,
+    src_path: str,
+    publish_dir: str,
+    cache_dir: str,
+    max_size: int,
+    quality: int,
+    fmt: str,
+) -> str:
+    """Write a small preview of src_path into publish_dir and return its file name.
+
+    Thumbnails are cached by source hash and settings, so an image that is
+    shown again does not need to be decoded and scaled again.
+    """
+    ext = THUMBNAIL_FORMATS[fmt]
+    suffix = f"_{max_size}_{quality}{ext}"
+    thumbs_dir = os.path.join(cache_dir, "thumbnails")
+    base, hit = await hass.async_add_executor_job(_cache_lookup_sync, thumbs_dir, src_path, suffix)
+    cached_path = f"{base}{suffix}"
+
+    if not hit:
+        await async_run_in_pool(hass, worker.make_thumbnail, src_path, cached_path, max_size, quality, fmt)
+        await hass.async_add_executor_job(_prune_cache_sync, thumbs_dir)
+
+    return await hass.async_add_executor_job(_copy_thumbnail_sync, cached_path, src_path, publish_dir, ext)
+
+
+# Upload encoding
+
+def _encoded_size_diff_sync(src_path: str, dst_path: str) -> int:
+    return os.path.getsize(src_path) - os.path.getsize(dst_path)
+
+
+async def async_encode_for_upload(hass: HomeAssistant, src_path: str, cache_dir: str) -> tuple[str, int]:
+    """Return (path to upload, bytes saved) for src_path.
+
+    Already-quantized images are re-encoded as indexed-palette PNG, cached by
+    content hash. Falls back to src_path when that does not make it smaller.
+    """
+    encoded_dir = os.path.join(cache_dir, "encoded")
+    base, hit = await hass.async_add_executor_job(
+        _cache_lookup_sync, encoded_dir, src_path, ".png", worker.ENCODE_SKIP
+    )
+
+    if hit == worker.ENCODE_SKIP:
+        return src_path, 0
+    if hit == ".png":
+        saved = await hass.async_add_executor_job(_encoded_size_diff_sync, src_path, f"{base}.png")
+        return f"{base}.png", saved
+
+    saved = await async_run_in_pool(hass, worker.encode_palette_png, src_path, base)
+    await hass.async_add_executor_job(_prune_cache_sync, encoded_dir)
+    if saved <= 0:
+        return src_path, 0
+    return f"{base}.png", saved
@@ -0,0 +1,214 @@
+import logging
+import os
+import struct
+from dataclasses import dataclass
+from typing import Optional
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# PNG IHDR color types we can send to the frame (16 bit depth is rejected separately)
+_PNG_MODES = {0: "L", 2: "RGB", 3: "P", 4: "LA", 6: "RGBA"}
+_PNG_ALLOWED_MODES = {"L", "RGB", "P", "RGBA"}
+
+# JPEG component count -> mode (4 components = CMYK/YCCK, not supported by the frame)
+_JPEG_MODES = {1: "L", 3: "RGB", 4: "CMYK"}
+_JPEG_ALLOWED_MODES = {"L", "RGB"}
+
+# JPEG SOFn markers carry the frame size; C4 (DHT), C8 (JPG) and CC (DAC) are not SOFs
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+# Stop walking JPEG segments after this many bytes (EXIF/ICC blocks before SOF are rarely larger)
+_JPEG_MAX_SCAN = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class ImageHeader:
+    format: str
+    width: int
+    height: int
+    mode: str
+    bit_depth: int = 8
+
+
+class HeaderError(Exception):
+    """Raised when an image header cannot be parsed."""
+
+
+def read_image_header(path: str) -> ImageHeader:
+    """Parse format, dimensions and color mode from the file header only."""
+    with open(path, "rb") as f:
+        head = f.read(32)
+        if head.startswith(PNG_SIGNATURE):
+            return _parse_png(head)
+        if head[:2] == b"\xff\xd8":
+            f.seek(2)
+            return _parse_jpeg(f)
+        if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+            return _parse_webp(head)
+    raise HeaderError("unknown image format")
+
+
+def _parse_png(head: bytes) -> ImageHeader:
+    if len(head) < 29 or head[12:16] != b"IHDR":
+        raise HeaderError("truncated PNG header")
+    width, height, bit_depth, color_type = struct.unpack(">IIBB", head[16:26])
+    mode = _PNG_MODES.get(color_type)
+    if mode is None:
+        raise HeaderError(f"invalid PNG color type {color_type}")
+    return ImageHeader("png", width, height, mode, bit_depth)
+
+
+def _parse_jpeg(f) -> ImageHeader:
+    while f.tell() < _JPEG_MAX_SCAN:
+        b = f.read(1)
+        if not b:
+            break
+        if b != b"\xff":
+            raise HeaderError("corrupt JPEG marker")
+        marker = f.read(1)
+        # Skip fill bytes
+        while marker == b"\xff":
+            marker = f.read(1)
+        if not marker:
+            break
+        m = marker[0]
+        # Standalone markers without length
+        if m == 0x01 or 0xD0 <= m <= 0xD7:
+            continue
+        if m in (0xD9, 0xDA):
+            # EOI or start of scan before any frame header
+            break
+        seg_len_raw = f.read(2)
+        if len(seg_len_raw) < 2:
+            break
+        seg_len = struct.unpack(">H", seg_len_raw)[0]
+        if seg_len < 2:
+            raise HeaderError("corrupt JPEG segment length")
+        if m in _JPEG_SOF_MARKERS:
+            sof = f.read(6)
+            if len(sof) < 6:
+                break
+            precision, height, width, components = struct.unpack(">BHHB", sof)
+            mode = _JPEG_MODES.get(components, f"{components}ch")
+            return ImageHeader("jpeg", width, height, mode, precision)
+        f.seek(seg_len - 2, os.SEEK_CUR)
+    raise HeaderError("no JPEG frame header found")
+
+
+def _parse_webp(head: bytes) -> ImageHeader:
+    chunk = head[12:16]
+    data = head[20:32]
+    if len(data) < 10:
+        raise HeaderError("truncated WebP header")
+
+    if chunk == b"VP8 ":
+        if data[3:6] != b"\x9d\x01\x2a":
+            raise HeaderError("invalid VP8 start code")
+        width, height = struct.unpack("<HH", data[6:10])
+        return ImageHeader("webp", width & 0x3FFF, height & 0x3FFF, "RGB")
+
+    if chunk == b"VP8L":
+        if data[0] != 0x2F:
+            raise HeaderError("invalid VP8L signature")
+        bits = int.from_bytes(data[1:5], "little")
+        width = (bits & 0x3FFF) + 1
+        height = ((bits >> 14) & 0x3FFF) + 1
+        alpha = (bits >> 28) & 0x1
+        return ImageHeader("webp", width, height, "RGBA" if alpha else "RGB")
+
+    if chunk == b"VP8X":
+        flags = data[0]
+        width = int.from_bytes(data[4:7], "little") + 1
+        height = int.from_bytes(data[7:10], "little") + 1
+        if flags & 0x02:
+            raise HeaderError("animated WebP is not supported")
+        return ImageHeader("webp", width, height, "RGBA" if flags & 0x10 else "RGB")
+
+    raise HeaderError(f"unknown WebP chunk {chunk!r}")
+
+
+def check_header(header: ImageHeader, frame_width: int, frame_height: int) -> Optional[str]:
+    """Return None if the header matches the frame profile, otherwise a reason string."""
+    # Portrait images are fine as long as they match the rotated frame
+    if (header.width, header.height) not in ((frame_width, frame_height), (frame_height, frame_width)):
+        return f"size {header.width}x{header.height}, expected {frame_width}x{frame_height}"
+
+    if header.format == "png":
+        if header.mode not in _PNG_ALLOWED_MODES:
+            return f"unsupported PNG color mode {header.mode}"
+        if header.bit_depth > 8:
+            return f"unsupported PNG bit depth {header.bit_depth}"
+    elif header.format == "jpeg":
+        if header.mode not in _JPEG_ALLOWED_MODES:
+            return f"unsupported JPEG color mode {header.mode}"
+        if header.bit_depth != 8:
+            return f"unsupported JPEG precision {header.bit_depth}"
+
+    return None
+
+
+def _preflight_sync(
+    input_dir: str,
+    files: list[str],
+    frame_width: int,
+    frame_height: int,
+    cache: dict,
+) -> tuple[list[str], list[dict], dict]:
+    # cache is a read-only snapshot; the updated cache is returned and swapped
+    # in on the event loop, so concurrent calls never mutate a shared dict here
+    valid: list[str] = []
+    invalid: list[dict] = []
+    new_cache: dict = {}
+
+    for name in files:
+        path = os.path.join(input_dir, name)
+        try:
+            st = os.stat(path)
+        except OSError as e:
+            invalid.append({"file": name, "reason": f"stat failed: {e.strerror}"})
+            continue
+
+        key = (path, st.st_size, st.st_mtime_ns)
+
+        cached = cache.get(path)
+        if cached and cached[0] == key:
+            reason = cached[1]
+        else:
+            try:
+                reason = check_header(read_image_header(path), frame_width, frame_height)
+            except (HeaderError, OSError, struct.error) as e:
+                reason = str(e) or type(e).__name__
+
+        # Only listed files are carried over, so verdicts of removed files drop out
+        new_cache[path] = (key, reason)
+
+        if reason is None:
+            valid.append(name)
+        else:
+            invalid.append({"file": name, "reason": reason})
+
+    return valid, invalid, new_cache
+
+
+async def async_preflight_images(
+    hass: HomeAssistant,
+    input_dir: str,
+    files: list[str],
+    frame_width: int,
+    frame_height: int,
+) -> tuple[list[str], list[dict]]:
+    """Split files into (valid, invalid) by header check, cached by (path, size, mtime)."""
+    cache = dict(hass.data[DOMAIN].get("preflight_cache", {}))
+    valid, invalid, new_cache = await hass.async_add_executor_job(
+        _preflight_sync, input_dir, files, frame_width, frame_height, cache
+    )
+    hass.data[DOMAIN]["preflight_cache"] = new_cache
+    for item in invalid:
+        _LOGGER.debug("Preflight rejected %s: %s", item["file"], item["reason"])
+    return valid, invalid
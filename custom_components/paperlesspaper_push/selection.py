@@ -0,0 +1,47 @@
+# Varied-random selection. No Home Assistant imports at runtime, so
+# benchmarks/bench_selection.py can run it against an in-memory Store.
+import random
+from collections import deque
+from typing import TYPE_CHECKING
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+
+def calc_recent_max(n_files: int) -> int:
+    # 50% of files, minimum 5, maximum 50
+    return max(5, min(50, int(round(n_files * 0.5))))
+
+
+async def _load_recent(hass: "HomeAssistant", files: list[str], store_key: str) -> deque:
+    recent_max = calc_recent_max(len(files))
+
+    store = hass.data[DOMAIN]["store_recent"]
+    data = await store.async_load() or {}
+    recent = deque(data.get(store_key, data.get("recent", [])), maxlen=recent_max)
+
+    files_set = set(files)
+    return deque([f for f in recent if f in files_set], maxlen=recent_max)
+
+
+async def choose_varied(hass: "HomeAssistant", files: list[str], store_key: str = "recent") -> str:
+    """Choose a file with a moving 'recent' window persisted in Store."""
+    recent = await _load_recent(hass, files, store_key)
+
+    recent_set = set(recent)
+    candidates = [f for f in files if f not in recent_set]
+    chosen = random.choice(candidates or files)
+
+    recent.append(chosen)
+    await hass.data[DOMAIN]["store_recent"].async_save({"recent": list(recent)})
+
+    return chosen
+
+
+async def remember_recent(hass: "HomeAssistant", files: list[str], chosen: str, store_key: str = "recent") -> None:
+    """Add a file chosen outside choose_varied to the 'recent' window."""
+    recent = await _load_recent(hass, files, store_key)
+    recent.append(chosen)
+    await hass.data[DOMAIN]["store_recent"].async_save({"recent": list(recent)})
@@ -11,6 +11,12 @@ from .const import (
     ATTR_LAST_RESULT,
     ATTR_LAST_HTTP_STATUS,
     ATTR_LAST_ERROR,
+    ATTR_INVALID_FILES,
+    ATTR_INVALID_COUNT,
+    INVALID_FILES_MAX,
+    ATTR_THUMBNAIL_NAME,
+    ATTR_UPLOAD_BYTES,
+    ATTR_BYTES_SAVED,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -76,8 +82,19 @@ class PaperlesspaperPushStatusSensor(Entity):
             ATTR_LAST_HTTP_STATUS: data.get(ATTR_LAST_HTTP_STATUS),
             ATTR_LAST_ERROR: data.get(ATTR_LAST_ERROR),
             "published_name": data.get("published_name"),
+            ATTR_THUMBNAIL_NAME: data.get(ATTR_THUMBNAIL_NAME),
+            ATTR_UPLOAD_BYTES: data.get(ATTR_UPLOAD_BYTES),
+            ATTR_BYTES_SAVED: data.get(ATTR_BYTES_SAVED),
         }
 
+        invalid = self.hass.data.get(DOMAIN, {}).get(ATTR_INVALID_FILES) or []
+        self._attrs[ATTR_INVALID_FILES] = invalid[:INVALID_FILES_MAX]
+        self._attrs[ATTR_INVALID_COUNT] = len(invalid)
+
+        arrivals = self.hass.data.get(DOMAIN, {}).get("arrivals")
+        if arrivals is not None:
+            self._attrs["queued_arrivals"] = len(arrivals)
+
         self.async_write_ha_state()
 
     @property
@@ -0,0 +1,405 @@
+import asyncio
+import ctypes
+import ctypes.util
+import heapq
+import logging
+import os
+import struct
+import time
+from datetime import timedelta
+from typing import Callable, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+from homeassistant.helpers.storage import Store
+
+from .const import IMAGE_EXTENSIONS
+
+_LOGGER = logging.getLogger(__name__)
+
+# inotify(7) event masks
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+
+_WATCH_MASK = (
+    _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO
+    | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF | _IN_MOVE_SELF
+)
+_CHANGED_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+_REMOVED_MASK = _IN_DELETE | _IN_MOVED_FROM
+_GONE_MASK = _IN_DELETE_SELF | _IN_MOVE_SELF | _IN_IGNORED
+
+# struct inotify_event { int wd; uint32_t mask; uint32_t cookie; uint32_t len; char name[]; }
+_EVENT_HEADER = struct.Struct("iIII")
+
+_SAVE_DELAY = 1
+
+
+class ArrivalsQueue:
+    """New or modified files that should be shown before the varied-random pool.
+
+    Ordered by arrival time (oldest first) and persisted in Store so a restart
+    does not lose files that have not been shown yet. The Store also keeps the
+    last known directory snapshot (name -> size/mtime), so files that arrive
+    while Home Assistant is down are detected on the next start.
+    """
+
+    def __init__(self, store: Store, on_change: Optional[Callable[[], None]] = None):
+        self._store = store
+        self._on_change = on_change
+        self._entries: dict[str, float] = {}
+        self._heap: list[tuple[float, str]] = []
+        self._known: Optional[dict[str, tuple[int, int]]] = None
+
+    async def async_load(self) -> None:
+        data = await self._store.async_load() or {}
+        for item in data.get("arrivals", []):
+            self._entries[item["file"]] = float(item["ts"])
+        self._heap = [(ts, name) for name, ts in self._entries.items()]
+        heapq.heapify(self._heap)
+        if "known" in data:
+            self._known = {name: tuple(sig) for name, sig in data["known"].items()}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def known(self) -> Optional[dict[str, tuple[int, int]]]:
+        """Last persisted snapshot of input_dir, or None before the first start."""
+        return self._known
+
+    def _data_to_save(self) -> dict:
+        return {
+            "arrivals": [{"file": name, "ts": ts} for ts, name in sorted(
+                (ts, name) for name, ts in self._entries.items()
+            )],
+            "known": self._known or {},
+        }
+
+    @callback
+    def _changed(self, notify: bool = True) -> None:
+        self._store.async_delay_save(self._data_to_save, _SAVE_DELAY)
+        if notify and self._on_change:
+            self._on_change()
+
+    @callback
+    def set_known(self, snapshot: dict[str, tuple[int, int]]) -> None:
+        self._known = dict(snapshot)
+        self._changed(notify=False)
+
+    @callback
+    def push(self, name: str, sig: Optional[tuple[int, int]] = None, ts: Optional[float] = None) -> None:
+        """Queue a file; a re-modified file moves to its new arrival time."""
+        ts = time.time() if ts is None else ts
+        self._entries[name] = ts
+        heapq.heappush(self._heap, (ts, name))
+        if sig is not None:
+            if self._known is None:
+                self._known = {}
+            self._known[name] = sig
+        self._changed()
+
+    @callback
+    def discard(self, name: str) -> None:
+        """Remove a file from the queue, e.g. after it was shown."""
+        # Heap entries are dropped lazily in async_peek
+        if self._entries.pop(name, None) is not None:
+            self._changed()
+
+    @callback
+    def forget(self, name: str) -> None:
+        """Remove a deleted file from the queue and the snapshot."""
+        if self._known:
+            self._known.pop(name, None)
+        if self._entries.pop(name, None) is not None:
+            self._changed()
+        else:
+            self._changed(notify=False)
+
+    @callback
+    def async_peek(self, files: list[str]) -> Optional[str]:
+        """Return the oldest queued file that is still selectable, or None.
+
+        The file stays queued until discard() is called after a successful
+        upload. Queued files that are no longer in files (deleted, or rejected
+        by preflight) are dropped; a later change will queue them again.
+        """
+        files_set = set(files)
+        dropped = False
+
+        while self._heap:
+            ts, name = self._heap[0]
+            if self._entries.get(name) != ts:
+                heapq.heappop(self._heap)  # stale heap entry
+                continue
+            if name in files_set:
+                break
+            heapq.heappop(self._heap)
+            del self._entries[name]
+            dropped = True
+
+        if dropped:
+            self._changed()
+        return self._heap[0][1] if self._heap else None
+
+
+def _is_image(name: str) -> bool:
+    return not name.startswith(".") and os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS
+
+
+def _stat_sig(path: str) -> Optional[tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    if not os.path.isfile(path):
+        return None
+    return (st.st_size, st.st_mtime_ns)
+
+
+def _scan_sync(input_dir: str) -> dict[str, tuple[int, int]]:
+    snapshot: dict[str, tuple[int, int]] = {}
+    try:
+        with os.scandir(input_dir) as it:
+            for entry in it:
+                if not _is_image(entry.name):
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    st = entry.stat()
+                except OSError:
+                    continue
+                snapshot[entry.name] = (st.st_size, st.st_mtime_ns)
+    except FileNotFoundError:
+        pass
+    return snapshot
+
+
+def _inotify_init(input_dir: str) -> int:
+    """Return an inotify fd watching input_dir, or raise OSError."""
+    libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    if not hasattr(libc, "inotify_init1"):
+        raise OSError("inotify not available")
+
+    fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    if fd < 0:
+        err = ctypes.get_errno()
+        raise OSError(err, os.strerror(err))
+
+    wd = libc.inotify_add_watch(fd, os.fsencode(input_dir), _WATCH_MASK)
+    if wd < 0:
+        err = ctypes.get_errno()
+        os.close(fd)
+        raise OSError(err, os.strerror(err))
+    return fd
+
+
+class InputDirWatcher:
+    """Feed new or modified files in input_dir into an ArrivalsQueue.
+
+    Uses inotify where available and falls back to polling otherwise. Files
+    are only queued once they have not changed for debounce_s seconds, so
+    images that are still being copied are never picked half-written.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        input_dir: str,
+        queue: ArrivalsQueue,
+        debounce_s: int,
+        poll_interval_s: int,
+        force_polling: bool = False,
+    ):
+        self.hass = hass
+        self._input_dir = input_dir
+        self._queue = queue
+        self._debounce_s = debounce_s
+        self._poll_interval_s = poll_interval_s
+        self._force_polling = force_polling
+
+        self._fd: Optional[int] = None
+        self._timers: dict[str, Callable[[], None]] = {}
+        self._unsub_poll: Optional[Callable[[], None]] = None
+        self._snapshot: Optional[dict[str, tuple[int, int]]] = None
+        self._pending: dict[str, tuple[int, int]] = {}
+
+    async def async_start(self) -> None:
+        current = await self.hass.async_add_executor_job(_scan_sync, self._input_dir)
+        changed = self._reconcile(current)
+
+        if not self._force_polling:
+            try:
+                self._fd = await self.hass.async_add_executor_job(_inotify_init, self._input_dir)
+            except (OSError, AttributeError) as e:
+                _LOGGER.info("inotify unavailable for %s (%s), falling back to polling", self._input_dir, e)
+            else:
+                asyncio.get_running_loop().add_reader(self._fd, self._on_readable)
+                _LOGGER.debug("Watching %s via inotify", self._input_dir)
+                for name in changed:
+                    self._schedule_settle(name)
+                return
+
+        # Changed files are not in the baseline, so the first polls pick them up
+        await self._async_start_polling()
+
+    @callback
+    def _reconcile(self, current: dict[str, tuple[int, int]]) -> list[str]:
+        """Compare input_dir with the persisted snapshot; return files changed since then.
+
+        Used on start (changes while stopped) and after an inotify queue
+        overflow (events that were dropped).
+        """
+        known = self._queue.known
+        if known is None:
+            # First start: everything that is there now is the baseline
+            self._queue.set_known(current)
+            return []
+
+        for name in known.keys() - current.keys():
+            self._queue.forget(name)
+
+        changed = [name for name, sig in current.items() if known.get(name) != sig]
+        self._queue.set_known({name: sig for name, sig in current.items() if known.get(name) == sig})
+        if changed:
+            _LOGGER.debug("%s file(s) changed in %s since the last snapshot", len(changed), self._input_dir)
+        return changed
+
+    @callback
+    def async_stop(self) -> None:
+        self._close_inotify()
+        if self._unsub_poll:
+            self._unsub_poll()
+            self._unsub_poll = None
+        for cancel in self._timers.values():
+            cancel()
+        self._timers.clear()
+
+    @callback
+    def _close_inotify(self) -> None:
+        if self._fd is None:
+            return
+        asyncio.get_running_loop().remove_reader(self._fd)
+        os.close(self._fd)
+        self._fd = None
+
+    # inotify
+
+    @callback
+    def _on_readable(self) -> None:
+        try:
+            buf = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            _LOGGER.warning("Reading inotify events failed (%s), falling back to polling", e)
+            self._switch_to_polling()
+            return
+
+        offset = 0
+        overflow = False
+        while offset + _EVENT_HEADER.size <= len(buf):
+            _wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(buf, offset)
+            offset += _EVENT_HEADER.size
+            name = buf[offset:offset + length].split(b"\0", 1)[0].decode(errors="surrogateescape")
+            offset += length
+
+            if mask & _IN_Q_OVERFLOW:
+                overflow = True
+                continue
+            if mask & _GONE_MASK:
+                _LOGGER.warning("%s was removed or moved, falling back to polling", self._input_dir)
+                self._switch_to_polling()
+                return
+            if mask & _IN_ISDIR or not _is_image(name):
+                continue
+
+            if mask & _REMOVED_MASK:
+                self._cancel_timer(name)
+                self._queue.forget(name)
+            elif mask & _CHANGED_MASK:
+                self._schedule_settle(name)
+
+        if overflow:
+            _LOGGER.debug("inotify queue overflow for %s, rescanning", self._input_dir)
+            self.hass.async_create_task(self._async_rescan())
+
+    async def _async_rescan(self) -> None:
+        # Events were dropped, so find the changes by comparing with the snapshot
+        current = await self.hass.async_add_executor_job(_scan_sync, self._input_dir)
+        if self._fd is None:
+            return  # stopped or switched to polling, which rescans anyway
+        for name in self._reconcile(current):
+            self._schedule_settle(name)
+
+    @callback
+    def _switch_to_polling(self) -> None:
+        self._close_inotify()
+        self.hass.async_create_task(self._async_start_polling())
+
+    @callback
+    def _cancel_timer(self, name: str) -> None:
+        cancel = self._timers.pop(name, None)
+        if cancel:
+            cancel()
+
+    @callback
+    def _schedule_settle(self, name: str) -> None:
+        # Every write restarts the timer, so the file is queued once it went quiet
+        self._cancel_timer(name)
+
+        async def _settled(_now) -> None:
+            self._timers.pop(name, None)
+            sig = await self.hass.async_add_executor_job(_stat_sig, os.path.join(self._input_dir, name))
+            if sig is not None:
+                _LOGGER.debug("New arrival: %s", name)
+                self._queue.push(name, sig)
+
+        self._timers[name] = async_call_later(self.hass, self._debounce_s, _settled)
+
+    # polling
+
+    async def _async_start_polling(self) -> None:
+        if self._unsub_poll is not None:
+            return
+        # The persisted snapshot is the baseline; anything differing from it is an arrival
+        self._snapshot = dict(self._queue.known or {})
+        self._unsub_poll = async_track_time_interval(
+            self.hass, self._async_poll, timedelta(seconds=self._poll_interval_s)
+        )
+        _LOGGER.debug("Watching %s via polling every %ss", self._input_dir, self._poll_interval_s)
+
+    async def _async_poll(self, _now=None) -> None:
+        current = await self.hass.async_add_executor_job(_scan_sync, self._input_dir)
+        previous = self._snapshot or {}
+        now_ns = time.time_ns()
+
+        for name in previous.keys() - current.keys():
+            self._queue.forget(name)
+        for name in self._pending.keys() - current.keys():
+            del self._pending[name]
+
+        for name, sig in current.items():
+            if previous.get(name) == sig:
+                continue
+            # Changed since the last arrival: queue once it is unchanged across
+            # two polls and older than the debounce time
+            if self._pending.get(name) == sig and now_ns - sig[1] >= self._debounce_s * 1_000_000_000:
+                del self._pending[name]
+                previous[name] = sig
+                _LOGGER.debug("New arrival: %s", name)
+                self._queue.push(name, sig)
+            else:
+                self._pending[name] = sig
+
+        self._snapshot = {name: previous[name] for name in current if name in previous}
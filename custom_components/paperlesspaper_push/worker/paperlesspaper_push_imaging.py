@@ -0,0 +1,74 @@
+# CPU-heavy image work for the process pool in imaging.py. This module is
+# loaded as a top-level module from its own directory, so the spawned worker
+# process imports neither Home Assistant nor the integration package.
+# Pillow is imported lazily so it is only needed when the features are enabled.
+import os
+
+# Marker for sources where re-encoding does not help, so they are not tried again
+ENCODE_SKIP = ".skip"
+
+# 8-bit modes whose conversion to RGB is exact; anything else (I;16, I, F,
+# CMYK, ...) would lose data when reduced to a palette
+_ENCODE_MODES = ("RGB", "RGBA", "L", "LA", "P")
+
+
+def make_thumbnail(src_path: str, dst_path: str, max_size: int, quality: int, fmt: str) -> None:
+    from PIL import Image
+
+    with Image.open(src_path) as img:
+        # Pillow falls back to nearest-neighbour for palette images, which
+        # aliases dithered frame images badly; scale in RGB(A) instead
+        has_alpha = img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info
+        img = img.convert("RGBA" if has_alpha and fmt != "jpeg" else "RGB")
+
+    img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+    tmp_path = f"{dst_path}.tmp"
+    img.save(tmp_path, format=fmt.upper(), quality=quality)
+    os.replace(tmp_path, dst_path)
+
+
+def encode_palette_png(src_path: str, dst_base: str) -> int:
+    """Losslessly re-encode src_path as indexed-palette PNG at dst_base + ".png".
+
+    Returns the bytes saved, or 0 (and writes a skip marker) if the image is
+    not 8-bit RGB/RGBA/L/LA/P, has more than 256 colors, uses transparency or
+    does not get smaller.
+    """
+    from PIL import Image
+
+    dst_path = f"{dst_base}.png"
+    tmp_path = f"{dst_path}.tmp"
+
+    with Image.open(src_path) as img:
+        img.load()
+        has_alpha = "transparency" in img.info or (
+            img.mode in ("RGBA", "LA") and img.getchannel("A").getextrema() != (255, 255)
+        )
+        lossless = img.mode in _ENCODE_MODES and not has_alpha
+        rgb = img.convert("RGB") if lossless else None
+
+    colors = rgb.getcolors(256) if rgb is not None else None
+    if colors is None:
+        open(f"{dst_base}{ENCODE_SKIP}", "wb").close()
+        return 0
+
+    palette = [c for _, c in colors]
+    index = {c: i for i, c in enumerate(palette)}
+    out = Image.new("P", rgb.size)
+    out.putpalette([v for c in palette for v in c])
+    # getdata() is deprecated since Pillow 12 in favor of get_flattened_data()
+    pixels = rgb.get_flattened_data() if hasattr(rgb, "get_flattened_data") else rgb.getdata()
+    # Every pixel maps to its exact color in the palette, so this is lossless
+    out.putdata([index[c] for c in pixels])
+
+    # optimize=True uses the highest zlib level; bit depth follows the palette size
+    out.save(tmp_path, format="PNG", optimize=True)
+
+    saved = os.path.getsize(src_path) - os.path.getsize(tmp_path)
+    if saved <= 0:
+        os.remove(tmp_path)
+        open(f"{dst_base}{ENCODE_SKIP}", "wb").close()
+        return 0
+
+    os.replace(tmp_path, dst_path)
+    return saved